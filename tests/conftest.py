@@ -0,0 +1,19 @@
+"""Shared setup for the main.py test suite"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Keep test runs out of the tracked log file
+os.environ.setdefault('JOB_APPLICATION_LOG_FILE', str(Path(tempfile.gettempdir()) / 'job_application_system_tests.log'))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in an empty directory, since JobApplicationSystem creates its output and cache folders in the cwd"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -0,0 +1,71 @@
+"""Archiving old runs, restoring them and enforcing the archive retention budget"""
+
+import json
+import logging
+import os
+import time
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def archiver(tmp_path):
+    output_dir = tmp_path / 'output'
+    return main.RunArchiver(output_dir, blob_store=main.BlobStore(output_dir / 'blobs'),
+                            manifest=main.RunManifest(output_dir / 'manifest.jsonl'),
+                            results_store=main.ResultsStore(output_dir / 'results.db'))
+
+
+def add_run(archiver, run_id, days_old=40):
+    run_dir = archiver.runs_dir / run_id
+    run_dir.mkdir(parents=True)
+    (run_dir / 'analysis.md').write_text(f"analysis of {run_id}", encoding='utf-8')
+    (run_dir / 'metadata.json').write_text(json.dumps({'status': 'success'}), encoding='utf-8')
+    modified = time.time() - days_old * 86400
+    os.utime(run_dir, (modified, modified))
+    archiver.results_store.record_run(run_id, {'job_posting_url': 'https://jobs.example.com/a'},
+                                      {'status': 'success', 'output_directory': str(run_dir)}, {})
+
+
+def test_archived_run_can_be_restored(archiver):
+    add_run(archiver, 'old')
+    add_run(archiver, 'recent', days_old=0)
+
+    assert archiver.archive(older_than_days=30) == 1
+    assert not (archiver.runs_dir / 'old').exists()
+    assert {row['run_id']: row['archive'] for row in archiver.results_store.query()}['old'].startswith('runs-')
+
+    run_dir = archiver.restore('old')
+
+    assert (run_dir / 'analysis.md').read_text(encoding='utf-8') == "analysis of old"
+    assert archiver.manifest.find('old')['directory'] == str(run_dir.relative_to(archiver.output_dir))
+    assert {row['run_id']: row['archive'] for row in archiver.results_store.query()}['old'] is None
+
+
+def test_retention_marks_runs_of_deleted_archives_as_expired(archiver, caplog):
+    add_run(archiver, 'old')
+    archiver.archive(older_than_days=30)
+    [archive_path] = archiver.archive_dir.glob('runs-*.zip')
+
+    assert archiver.enforce_retention(max_size_mb=0) == 1
+
+    assert not archive_path.exists()
+    assert 'expired_at' in archiver.load_index()['old']
+    entry = archiver.manifest.find('old')
+    assert 'expired_at' in entry and entry['archive'] is None and entry['directory'] is None
+    [row] = archiver.results_store.query()
+    assert (row['status'], row['archive'], row['output_directory']) == ('expired', None, '')
+
+    with caplog.at_level(logging.ERROR):
+        assert archiver.restore('old') is None
+    assert "expired by retention" in caplog.text
+    # Expired runs are not counted again by a later pass
+    assert archiver.enforce_retention(max_size_mb=0) == 0
+
+
+def test_restore_of_an_unknown_run_reports_it(archiver, caplog):
+    with caplog.at_level(logging.ERROR):
+        assert archiver.restore('missing') is None
+    assert "not in the archive index" in caplog.text
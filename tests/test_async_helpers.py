@@ -0,0 +1,44 @@
+"""Running coroutines from sync code and bounding scraper retries by the stage deadline"""
+
+import asyncio
+import contextvars
+import time
+
+import pytest
+
+import main
+
+request_id = contextvars.ContextVar('request_id', default=None)
+
+
+async def read_context():
+    return request_id.get(), main._current_deadline.get()
+
+
+def test_run_coroutine_sync_without_a_running_loop_keeps_the_context():
+    request_id.set('outer')
+
+    assert main.run_coroutine_sync(read_context())[0] == 'outer'
+
+
+def test_run_coroutine_sync_inside_a_running_loop_keeps_the_context():
+    deadline = main.Deadline(5, label='stage')
+
+    async def caller():
+        request_id.set('inside-loop')
+        with main.deadline_scope(deadline):
+            # Blocks the loop, so the coroutine is driven from a helper thread
+            return main.run_coroutine_sync(read_context())
+
+    assert asyncio.run(caller()) == ('inside-loop', deadline)
+
+
+def test_scraper_backoff_is_bounded_by_the_stage_deadline():
+    scraper = main.AsyncScraper(main.HttpClient(timeout_seconds=1), delay_seconds=0, max_retries=3, backoff_base=5)
+
+    started = time.perf_counter()
+    with main.deadline_scope(main.Deadline(0.5, label='stage')):
+        with pytest.raises(main.DeadlineExceeded):
+            # Nothing listens on the discard port, so every attempt fails and is retried
+            scraper.scrape('http://127.0.0.1:9/posting')
+    assert time.perf_counter() - started < 2
@@ -0,0 +1,77 @@
+"""Publishing run outputs on the background writer"""
+
+import threading
+
+import pytest
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+CONFIG = {'outputs': {'background_writes': True},
+          'mock_latency': {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}}
+
+
+@pytest.fixture
+def held_publishes(monkeypatch):
+    """Hold every publish on the writer thread until the returned event is set"""
+    release = threading.Event()
+    publish = main.RunWriter._publish
+
+    def held(writer):
+        release.wait(10)
+        return publish(writer)
+
+    monkeypatch.setattr(main.RunWriter, '_publish', held)
+    yield release
+    release.set()
+
+
+@pytest.fixture
+def system(workdir):
+    system = main.JobApplicationSystem(CONFIG)
+    yield system
+    # Let the writer finish indexing while the working directory is still the test's
+    system.io_executor.shutdown(wait=True)
+
+
+def complete_event(system, label):
+    return [event for event in system.iter_analysis(INPUTS, run_label=label) if event['event'] == 'complete'][0]
+
+
+def test_each_run_waits_only_for_its_own_publish(system, held_publishes):
+    first = complete_event(system, 'first')
+    second = complete_event(system, 'second')
+
+    assert first['result']['published'] == second['result']['published'] == 'pending'
+
+    held_publishes.set()
+    result = system.wait_for_publish(first)
+
+    assert result['published'] is True
+    assert main.Path(result['output_directory']).is_dir()
+    # The other run's result belongs to its own caller and is left alone
+    assert second['result']['published'] == 'pending'
+    assert system.wait_for_publish(second)['published'] is True
+
+
+def test_results_store_records_a_snapshot_of_the_result(system, held_publishes):
+    event = complete_event(system, 'snapshot')
+    status = event['result']['status']
+
+    # The caller owns its result dict while the writer is still busy
+    event['result']['status'] = 'changed by caller'
+    held_publishes.set()
+    system.wait_for_publish(event)
+    system.io_executor.submit(lambda: None).result()
+
+    [row] = system.results_store.query()
+    assert row['run_id'] == event['result']['run_id']
+    assert row['status'] == status
+
+
+def test_run_analysis_reports_the_publish_outcome(system):
+    result = system.run_analysis(INPUTS)
+
+    assert result['published'] is True
+    assert main.Path(result['output_directory']).is_dir()
@@ -0,0 +1,52 @@
+"""Batch runs over a JSONL stream of job postings"""
+
+import json
+
+import pytest
+
+import main
+
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def posting(index):
+    return {'job_posting_url': f"https://jobs{index}.example.com/ai-engineer", 'github_url': 'https://github.com/example',
+            'personal_writeup': 'Engineer'}
+
+
+def write_input(path, lines):
+    path.write_text("\n".join(line if isinstance(line, str) else json.dumps(line) for line in lines) + "\n",
+                    encoding='utf-8')
+    return path
+
+
+def test_invalid_lines_are_reported_without_stopping_the_stream(tmp_path):
+    input_path = write_input(tmp_path / 'postings.jsonl', [posting(1), "", "{broken", "[1, 2]", {'github_url': 'x'}])
+
+    records = list(main.iter_batch_records(input_path))
+
+    assert [(line, error is None) for line, _, error in records] == [(1, True), (3, False), (4, False), (5, False)]
+    assert records[1][2].startswith("Invalid JSON")
+    assert records[2][2] == "Record is not a JSON object"
+    assert records[3][2] == "Missing required input: job_posting_url, personal_writeup"
+
+
+@pytest.mark.parametrize('executor_type', ['thread', 'process'])
+def test_every_record_gets_one_result_line(workdir, executor_type):
+    input_path = write_input(workdir / 'postings.jsonl', [posting(1), "{broken", posting(2), posting(3)])
+    output_path = workdir / 'results' / 'batch_results.jsonl'
+
+    counts = main.run_batch(input_path, output_path, workers=2, executor_type=executor_type,
+                            config={'mock_latency': ZERO_LATENCY})
+
+    assert counts == {'processed': 4, 'success': 3, 'partial_success': 0, 'error': 1}
+    results = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+    assert sorted(result['line'] for result in results) == [1, 2, 3, 4]
+    assert {result['line']: result['status'] for result in results}[2] == 'error'
+    # Each run is published in its own directory
+    assert len({result['output_directory'] for result in results if result['status'] == 'success'}) == 3
+
+
+def test_unknown_executor_type_is_rejected(workdir):
+    with pytest.raises(ValueError, match="Unknown executor type"):
+        main.run_batch(workdir / 'in.jsonl', workdir / 'out.jsonl', executor_type='fiber')
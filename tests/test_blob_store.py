@@ -0,0 +1,59 @@
+"""Content-addressed, deduplicated artifact storage"""
+
+import os
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def test_identical_content_is_stored_once_and_read_only(tmp_path):
+    store = main.BlobStore(tmp_path / 'blobs')
+
+    digest, created = store.put(b"cover letter")
+    again, created_again = store.put(b"cover letter")
+
+    assert (digest, created, created_again) == (again, True, False)
+    assert store.path(digest).read_bytes() == b"cover letter"
+    assert store.path(digest).stat().st_mode & 0o222 == 0
+    assert len(list((tmp_path / 'blobs').glob('*/*'))) == 1
+
+
+def test_links_share_the_blob_on_disk(tmp_path):
+    store = main.BlobStore(tmp_path / 'blobs')
+    digest, _ = store.put(b"analysis")
+
+    store.link(digest, tmp_path / 'runs' / 'a' / 'analysis.md')
+    store.link(digest, tmp_path / 'runs' / 'b' / 'analysis.md')
+
+    assert os.path.samefile(tmp_path / 'runs' / 'a' / 'analysis.md', tmp_path / 'runs' / 'b' / 'analysis.md')
+
+
+def test_dedupe_replaces_duplicate_files_with_links(tmp_path):
+    store = main.BlobStore(tmp_path / 'blobs')
+    files = []
+    for name, content in (('one.md', b"same"), ('two.md', b"same"), ('three.md', b"different")):
+        files.append(tmp_path / name)
+        files[-1].write_bytes(content)
+
+    stats = store.dedupe(files)
+
+    assert stats == {'files': 3, 'deduplicated': 1, 'bytes_saved': 4}
+    assert os.path.samefile(files[0], files[1])
+    assert files[1].read_bytes() == b"same"
+    # Already linked files are left alone on a second pass
+    assert store.dedupe(files)['deduplicated'] == 0
+
+
+def test_runs_with_identical_outputs_share_blobs(workdir):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY})
+
+    first = system.run_analysis(INPUTS)
+    second = system.run_analysis(INPUTS)
+
+    first_dir, second_dir = main.Path(first['output_directory']), main.Path(second['output_directory'])
+    artifacts = sorted(path.name for path in first_dir.iterdir() if path.name != 'metadata.json')
+    assert artifacts
+    assert all(os.path.samefile(first_dir / name, second_dir / name) for name in artifacts)
@@ -0,0 +1,84 @@
+"""Per-stage checkpoints keyed by input fingerprints, and atomic file writes"""
+
+import json
+import os
+import time
+
+import pytest
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def make_task(description="Analyse {job_posting_url}"):
+    return main.MockTask('job_analysis', description, main.MockAgent(role='Researcher', mock_response="done"))
+
+
+def test_fingerprint_follows_only_what_the_stage_depends_on():
+    fingerprint = main.StageCheckpointStore.fingerprint
+    task = make_task()
+    base = fingerprint(task, INPUTS, {'upstream': "output"})
+
+    # personal_writeup is not referenced by the description
+    assert fingerprint(task, {**INPUTS, 'personal_writeup': 'Other'}, {'upstream': "output"}) == base
+    assert fingerprint(task, {**INPUTS, 'job_posting_url': 'https://other.example.com'}, {'upstream': "output"}) != base
+    assert fingerprint(task, INPUTS, {'upstream': "changed output"}) != base
+    assert fingerprint(make_task("Summarise {job_posting_url}"), INPUTS, {'upstream': "output"}) != base
+
+
+def test_checkpoints_expire_after_the_ttl(tmp_path):
+    store = main.StageCheckpointStore(tmp_path, ttl_hours=1)
+    store.save('job_analysis', 'f' * 64, "analysis")
+
+    assert store.load('job_analysis', 'f' * 64) == "analysis"
+    assert store.load('job_analysis', 'e' * 64) is None
+
+    checkpoint_path = store._checkpoint_path('job_analysis', 'f' * 64)
+    checkpoint = json.loads(checkpoint_path.read_text(encoding='utf-8'))
+    checkpoint['created_at'] = time.time() - 7200
+    checkpoint_path.write_text(json.dumps(checkpoint), encoding='utf-8')
+    assert store.load('job_analysis', 'f' * 64) is None
+
+    store.save('job_analysis', 'd' * 64, "analysis")
+    old = time.time() - 7200
+    os.utime(store._checkpoint_path('job_analysis', 'd' * 64), (old, old))
+    assert store.prune() == 1
+
+
+def test_second_run_reuses_every_stage(workdir):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY})
+
+    first = system.run_analysis(INPUTS)
+    second = system.run_analysis(INPUTS)
+    fresh = system.run_analysis(INPUTS, resume=False)
+
+    assert first['reused_stages'] == []
+    assert second['reused_stages'] == sorted(second['stage_timings'])
+    assert second['result'] == first['result']
+    assert fresh['reused_stages'] == []
+
+
+def test_atomic_write_replaces_the_file_in_one_step(tmp_path):
+    target = tmp_path / 'out.json'
+    target.write_text("old", encoding='utf-8')
+
+    main.atomic_write(target, "new")
+    assert target.read_text(encoding='utf-8') == "new"
+
+    main.atomic_write(target, b"bytes", mode=0o444)
+    assert target.read_bytes() == b"bytes"
+    assert target.stat().st_mode & 0o777 == 0o444
+
+
+def test_failed_atomic_write_keeps_the_old_file_and_no_temporary(tmp_path):
+    target = tmp_path / 'out.json'
+    target.write_text("old", encoding='utf-8')
+
+    with pytest.raises(TypeError):
+        main.atomic_write(target, 12345)
+
+    assert target.read_text(encoding='utf-8') == "old"
+    assert [path.name for path in tmp_path.iterdir()] == ['out.json']
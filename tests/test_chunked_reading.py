@@ -0,0 +1,58 @@
+"""Memory-mapped, chunked reading of large inputs"""
+
+import pytest
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def empty_encoding_cache():
+    main._encoding_cache.clear()
+    yield
+    main._encoding_cache.clear()
+
+
+def test_chunks_rejoin_to_the_text_even_when_characters_span_chunks(tmp_path):
+    text = "Résumé ✓ " * 500
+    path = tmp_path / 'resume.md'
+    path.write_text(text, encoding='utf-8')
+
+    # 7 bytes per chunk splits most multi-byte characters
+    chunks = list(main.iter_file_text(path, chunk_size=7))
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == text
+
+
+def test_late_non_utf8_byte_is_detected_before_anything_is_yielded(tmp_path):
+    data = b"a" * 10_000 + "café".encode('latin-1')
+    path = tmp_path / 'notes.txt'
+    path.write_bytes(data)
+
+    assert "".join(main.iter_file_text(path, chunk_size=1024)) == data.decode('latin-1')
+
+
+def test_empty_file_yields_nothing(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b"")
+
+    assert list(main.iter_file_text(path)) == []
+    assert main.safe_read_file(path) == ""
+
+
+def test_files_over_the_size_limit_are_refused(tmp_path):
+    path = tmp_path / 'large.txt'
+    path.write_bytes(b"x" * 2048)
+
+    with pytest.raises(ValueError, match="over the"):
+        list(main.iter_file_text(path, max_size_mb=1 / 1024))
+    assert main.safe_read_file(path, max_size_mb=1 / 1024).startswith("Error reading file:")
+    assert main.safe_read_file(path, max_size_mb=1) == "x" * 2048
+
+
+def test_file_read_tool_streams_within_its_limit(tmp_path):
+    path = tmp_path / 'resume.md'
+    path.write_text("line\n" * 1000, encoding='utf-8')
+    tool = main.MockFileReadTool(path, max_size_mb=1)
+
+    assert "".join(tool.iter_chunks(chunk_size=512)) == tool.read()
@@ -0,0 +1,71 @@
+"""Company research shared across postings, threads and worker processes"""
+
+import json
+import os
+import threading
+import time
+
+import main
+
+
+def test_research_is_served_from_memory_then_disk(tmp_path):
+    store = main.CompanyResearchStore(tmp_path)
+    store.put('acme', 'research on acme')
+
+    assert store.get('acme') == ('research on acme', 'memory')
+    # A second process only sees what was written to disk
+    assert main.CompanyResearchStore(tmp_path).get('acme') == ('research on acme', 'disk')
+    assert main.CompanyResearchStore(tmp_path).get('other') == (None, None)
+
+
+def test_expired_research_is_not_served(tmp_path):
+    store = main.CompanyResearchStore(tmp_path, ttl_hours=1)
+    store.put('acme', 'research on acme')
+    two_hours_ago = time.time() - 7200
+    store._memory['acme'] = (two_hours_ago, 'research on acme')
+    store._store_path('acme').write_text(
+        json.dumps({'company': 'acme', 'created_at': two_hours_ago, 'research': 'research on acme'}))
+
+    assert store.get('acme') == (None, None)
+
+
+def test_long_computation_keeps_its_lock_alive(tmp_path):
+    # Two stores over one directory behave like two worker processes
+    stores = [main.CompanyResearchStore(tmp_path, lock_stale_seconds=0.2) for _ in range(2)]
+    computed = []
+
+    def compute():
+        computed.append(threading.current_thread().name)
+        # Well past lock_stale_seconds, as a slow research stage would be
+        time.sleep(0.8)
+        return 'research on acme'
+
+    results = {}
+
+    def run(index):
+        results[index] = stores[index].get_or_compute('acme', compute)
+
+    first = threading.Thread(target=run, args=(0,))
+    first.start()
+    time.sleep(0.1)
+    second = threading.Thread(target=run, args=(1,))
+    second.start()
+    first.join()
+    second.join()
+
+    assert len(computed) == 1
+    assert results[0] == ('research on acme', 'computed')
+    assert results[1] == ('research on acme', 'coalesced')
+
+
+def test_lock_left_by_a_dead_worker_is_abandoned(tmp_path):
+    store = main.CompanyResearchStore(tmp_path, lock_stale_seconds=0.2)
+    lock_path = store._store_path('acme').with_suffix('.lock')
+    lock_path.write_text('12345')
+    stale = time.time() - 1
+    os.utime(lock_path, (stale, stale))
+
+    started = time.perf_counter()
+    assert store.get_or_compute('acme', lambda: 'research on acme') == ('research on acme', 'computed')
+    assert time.perf_counter() - started < 1
+    assert not lock_path.exists()
@@ -0,0 +1,90 @@
+"""Per-stage deadlines and iteration caps"""
+
+import asyncio
+import time
+
+import pytest
+
+import main
+
+
+def make_task(name, context=None, timeout_seconds=None, tools=None, max_iterations=None):
+    agent = main.MockAgent(role=name, mock_response=f"{name} output", tools=tools)
+    return main.MockTask(name, f"Run {name}", agent, context=context,
+                         timeout_seconds=timeout_seconds, max_iterations=max_iterations)
+
+
+def run_graph(tasks, execute):
+    return asyncio.run(main.TaskGraphScheduler(tasks).run(execute))
+
+
+def test_hung_stage_does_not_hold_up_the_run():
+    hung = make_task('hung', timeout_seconds=0.3)
+    downstream = make_task('downstream', context=[hung])
+    independent = make_task('independent')
+
+    def execute(task, context_outputs):
+        if task.name == 'hung':
+            # Never reaches a deadline check
+            time.sleep(3)
+        return task.name
+
+    started = time.perf_counter()
+    result = run_graph([hung, downstream, independent], execute)
+
+    assert time.perf_counter() - started < 1.5
+    assert result['timed_out'] == ['hung']
+    assert result['skipped'] == ['downstream']
+    assert result['outputs'] == {'independent': 'independent'}
+    assert result['stage_timings']['hung']['status'] == 'timed_out'
+
+
+def test_stage_deadline_stops_work_at_the_next_check():
+    def execute(task, context_outputs):
+        main.sleep_within_deadline(2)
+        return task.name
+
+    started = time.perf_counter()
+    result = run_graph([make_task('slow', timeout_seconds=0.2)], execute)
+
+    assert time.perf_counter() - started < 1
+    assert result['timed_out'] == ['slow']
+
+
+def test_deadline_scope_is_visible_to_checks_and_timeouts():
+    with main.deadline_scope(main.Deadline(5, label='stage')):
+        assert main.deadline_timeout(30) <= 5
+        assert main.deadline_timeout(1) == 1
+        main.check_deadline()
+
+    with main.deadline_scope(main.Deadline(0, label='stage')):
+        with pytest.raises(main.DeadlineExceeded):
+            main.check_deadline()
+
+    assert main.current_deadline() is None
+
+
+class CountingTool:
+    def __init__(self):
+        self.calls = 0
+
+    def run(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_agent_uses_every_tool_within_max_iterations():
+    tools = [CountingTool() for _ in range(3)]
+    task = make_task('prep', tools=tools, max_iterations=2)
+
+    assert task.agent.use_tools(task, {'job_posting_url': 'https://example.com/job'}) == ['1', '1', '1']
+
+    task.max_iterations = 0
+    assert task.agent.use_tools(task, {'job_posting_url': 'https://example.com/job'}) == []
+
+
+def test_task_limits_come_from_config_minutes(workdir):
+    system = main.JobApplicationSystem({'tasks': {'application_prep': {'timeout_minutes': 2, 'max_iterations': 4}}})
+
+    assert system.task_limits('application_prep') == {'timeout_seconds': 120, 'max_iterations': 4}
+    assert system.task_limits('missing') == {'timeout_seconds': None, 'max_iterations': None}
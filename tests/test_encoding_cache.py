@@ -0,0 +1,63 @@
+"""Encoding detection in safe_read_file: UTF-8 fast path and the mtime-keyed detection cache"""
+
+import os
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def detections(monkeypatch):
+    """Record detect_encoding calls, answering cp1252 for every file"""
+    calls = []
+
+    def detect(file_path, raw_data):
+        calls.append(file_path.name)
+        return 'cp1252'
+
+    monkeypatch.setattr(main, 'detect_encoding', detect)
+    main._encoding_cache.clear()
+    yield calls
+    main._encoding_cache.clear()
+
+
+def test_utf8_files_need_no_detection(tmp_path, detections):
+    path = tmp_path / 'resume.md'
+    path.write_bytes("﻿Café résumé".encode('utf-8'))
+
+    # The BOM is dropped along with the decoding
+    assert main.safe_read_file(path) == "Café résumé"
+    assert detections == []
+
+
+def test_detected_encoding_is_reused_until_the_file_changes(tmp_path, detections):
+    path = tmp_path / 'letter.txt'
+    path.write_bytes("naïve “quotes”".encode('cp1252'))
+
+    assert main.safe_read_file(path) == "naïve “quotes”"
+    assert main.safe_read_file(path) == "naïve “quotes”"
+    assert detections == ['letter.txt']
+
+    path.write_bytes("changed — again".encode('cp1252'))
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 1_000_000))
+    assert main.safe_read_file(path) == "changed — again"
+    assert detections == ['letter.txt', 'letter.txt']
+
+
+def test_undecodable_detection_falls_back_to_latin1(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'detect_encoding', lambda file_path, raw_data: 'no-such-codec')
+    path = tmp_path / 'odd.bin'
+    path.write_bytes(b"caf\xe9")
+
+    assert main.safe_read_file(path) == "café"
+
+
+def test_encoding_cache_is_bounded(tmp_path, detections, monkeypatch):
+    monkeypatch.setattr(main, 'ENCODING_CACHE_MAX_ENTRIES', 2)
+    for index in range(3):
+        path = tmp_path / f"file{index}.txt"
+        path.write_bytes(b"caf\xe9")
+        main.safe_read_file(path)
+
+    assert len(main._encoding_cache) == 2
@@ -0,0 +1,61 @@
+"""Simulated stage and tool latency for mock mode"""
+
+import json
+
+import pytest
+
+import main
+
+
+def test_models_sample_zero_fixed_or_recorded_latency():
+    assert main.LatencyModel.from_config({}).sample() == 0.0
+    assert main.LatencyModel.from_config({'seconds': 1.5}).sample() == 1.5
+    recorded = main.LatencyModel.from_config({'model': 'recorded', 'samples': [0.1, 0.2], 'seed': 1})
+    assert {recorded.sample() for _ in range(20)} <= {0.1, 0.2}
+
+    with pytest.raises(ValueError, match="Unknown latency model"):
+        main.LatencyModel('gaussian')
+    with pytest.raises(ValueError, match="at least one sample"):
+        main.LatencyModel('recorded')
+
+
+def test_samples_are_read_from_lists_objects_and_run_results(tmp_path):
+    as_list = tmp_path / 'list.json'
+    as_list.write_text(json.dumps([1, 2]))
+    by_name = tmp_path / 'by_name.json'
+    by_name.write_text(json.dumps({'job_analysis': [3], 'other': [4]}))
+    results = tmp_path / 'batch_results.jsonl'
+    results.write_text("\n".join(json.dumps({'stage_timings': timings}) for timings in (
+        {'job_analysis': {'duration': 5, 'status': 'completed'}},
+        {'job_analysis': {'duration': 60, 'status': 'timed_out'}},
+        {'job_analysis': {'duration': 6}},
+    )))
+
+    assert main.load_latency_samples(as_list, 'job_analysis') == [1.0, 2.0]
+    assert main.load_latency_samples(by_name, 'job_analysis') == [3.0]
+    # Timed-out stages say nothing about how long the stage takes
+    assert main.load_latency_samples(results, 'job_analysis') == [5.0, 6.0]
+
+
+def test_recorded_default_draws_on_each_stage_own_samples(workdir):
+    samples_file = workdir / 'samples.json'
+    samples_file.write_text(json.dumps({'job_analysis': [0.25], 'company_research': [0.5]}))
+    system = main.JobApplicationSystem({'mock_latency': {'stages': {
+        'default': {'model': 'recorded', 'samples_file': str(samples_file)},
+        'skills_gap': {'model': 'zero'},
+    }}})
+
+    assert system.latency_model('stages', 'job_analysis').sample() == 0.25
+    assert system.latency_model('stages', 'company_research').sample() == 0.5
+    assert system.latency_model('stages', 'skills_gap').sample() == 0.0
+
+
+def test_recorded_model_without_samples_for_a_name_is_a_config_error(workdir):
+    samples_file = workdir / 'samples.json'
+    samples_file.write_text(json.dumps({'job_analysis': [0.25]}))
+    system = main.JobApplicationSystem({'mock_latency': {'stages': {
+        'default': {'model': 'recorded', 'samples_file': str(samples_file)},
+    }}})
+
+    with pytest.raises(ValueError, match="No recorded latency samples for 'cover_letter'"):
+        system.latency_model('stages', 'cover_letter')
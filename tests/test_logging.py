@@ -0,0 +1,57 @@
+"""Log formatting and log handling in batch worker processes"""
+
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import main
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_emoji_are_replaced_with_distinct_tags():
+    assert "♻️ Reusing checkpoint".translate(main.EMOJI_TRANSLATION) == "[CHECKPOINT] Reusing checkpoint"
+    assert "📝 Resume tailored".translate(main.EMOJI_TRANSLATION) == "[RESUME] Resume tailored"
+    assert len(set(main.EMOJI_REPLACEMENTS.values())) == len(main.EMOJI_REPLACEMENTS)
+
+
+def test_batch_worker_only_queues_records_for_the_parent(tmp_path):
+    # A fresh interpreter, like a spawned worker: importing main opens its own log file handler
+    script = textwrap.dedent(f"""
+        import logging, logging.handlers, queue, sys
+        sys.path.insert(0, {str(REPO_ROOT)!r})
+        import main
+
+        logging.getLogger().addHandler(logging.StreamHandler())
+        opened = list(main._log_listener.handlers)
+        log_queue = queue.SimpleQueue()
+        main._init_batch_worker(None, log_queue)
+
+        assert all(getattr(handler, 'stream', None) is None for handler in opened
+                   if isinstance(handler, logging.FileHandler)), "log file left open"
+        assert logging.getLogger().handlers == []
+        assert [type(handler) for handler in main.logger.handlers] == [logging.handlers.QueueHandler]
+        main.logger.info("from the worker")
+        while log_queue.get().getMessage() != "from the worker":
+            pass
+    """)
+    env = {**os.environ, 'JOB_APPLICATION_LOG_FILE': str(tmp_path / 'worker.log')}
+
+    completed = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=60)
+
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_startup_probe_prints_its_result_after_all_log_output(tmp_path):
+    probe = main.STARTUP_PROBE.format(module_dir=str(REPO_ROOT))
+    env = {**os.environ, 'JOB_APPLICATION_LOG_FILE': str(tmp_path / 'probe.log')}
+
+    completed = subprocess.run([sys.executable, '-c', probe], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=60, check=True)
+
+    lines = completed.stdout.strip().splitlines()
+    assert json.loads(lines[-1])['forbidden'] == []
@@ -0,0 +1,46 @@
+"""Per-run performance numbers aggregated from spans"""
+
+import pytest
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def test_metrics_aggregate_spans_by_kind():
+    metrics = main.RunMetrics()
+    root = main.Span('run', metrics=metrics)
+    with main.trace_span('call', 'llm', parent=root, agent='writer', prompt_tokens=10, completion_tokens=5,
+                         cache_hit=True):
+        pass
+    with main.trace_span('call', 'llm', parent=root, agent='writer', prompt_tokens=3, retries=2):
+        pass
+    with main.trace_span('search', 'tool', parent=root, coalesced=True, rate_limit_wait_ms=7):
+        pass
+
+    snapshot = metrics.snapshot(1.5, {'stage': {'duration': 0.25}}, reused_stages=['stage'])
+
+    assert snapshot['tokens'] == {'writer': {'in': 13, 'out': 5}}
+    assert snapshot['calls'] == {'llm': 2, 'tools': 1, 'coalesced': 1}
+    assert snapshot['cache'] == {'llm_hit_ratio': 0.5, 'stage_reuse_ratio': 1.0}
+    assert snapshot['retries'] == 2
+    assert snapshot['time_ms']['rate_limit_wait'] == 7
+    assert snapshot['stage_wall_ms'] == {'stage': 250.0}
+    # Peak RSS is the process's, which concurrent runs share
+    assert 'peak_rss_mb' not in snapshot and 'process_peak_rss_mb' in snapshot
+
+
+@pytest.mark.parametrize('background_writes', [False, True])
+def test_publish_time_is_attributed_to_the_run(workdir, background_writes):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY,
+                                        'outputs': {'background_writes': background_writes}})
+
+    result = system.run_analysis(INPUTS)
+    if system.io_executor is not None:
+        system.io_executor.shutdown(wait=True)
+
+    assert result['published'] is True
+    assert result['performance']['publish_ms'] > 0
+    assert result['performance']['time_ms']['io'] > 0
@@ -0,0 +1,78 @@
+"""Token-bucket rate limiting of providers and domains"""
+
+import time
+
+import pytest
+import requests
+
+import main
+
+
+def test_rate_limiter_spaces_calls_after_the_burst():
+    limiter = main.RateLimiter()
+    limiter.set_limit('provider:test', rate_per_second=10, capacity=2)
+
+    waits = [limiter.reserve('provider:test') for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+    assert limiter.stats()['provider:test']['calls'] == 4
+    # Keys without a limit are never delayed
+    assert limiter.reserve('provider:other') == 0.0
+
+
+def test_rate_limiter_applies_default_domain_limit():
+    limiter = main.RateLimiter()
+    limiter.default_domain_limit = (1.0, 1.0)
+
+    assert limiter.reserve(main.domain_key('https://Jobs.Example.com/a')) == 0.0
+    assert limiter.reserve(main.domain_key('https://jobs.example.com/b')) == pytest.approx(1.0, abs=0.05)
+    assert limiter.reserve(main.domain_key('https://other.example.com/')) == 0.0
+
+
+def test_rate_limiter_buckets_are_shared_through_sqlite(tmp_path):
+    db_path = tmp_path / 'rate_limits.db'
+    limiters = [main.RateLimiter(db_path), main.RateLimiter(db_path)]
+    for limiter in limiters:
+        limiter.set_limit('provider:test', rate_per_second=10, capacity=1)
+
+    assert limiters[0].reserve('provider:test') == 0.0
+    assert limiters[1].reserve('provider:test') == pytest.approx(0.1, abs=0.02)
+
+
+def test_rate_limiter_wait_is_bounded_by_the_stage_deadline():
+    limiter = main.RateLimiter()
+    limiter.set_limit('provider:test', rate_per_second=0.5, capacity=1)
+    limiter.acquire('provider:test')
+
+    started = time.perf_counter()
+    with main.deadline_scope(main.Deadline(0.2, label='stage')):
+        with pytest.raises(main.DeadlineExceeded):
+            limiter.acquire('provider:test')
+    assert time.perf_counter() - started < 1
+
+
+def test_provider_without_a_limit_falls_back_to_the_domain_bucket():
+    limiter = main.RateLimiter()
+    limiter.default_domain_limit = (1.0, 1.0)
+    client = main.HttpClient(timeout_seconds=1, rate_limiter=limiter)
+
+    for _ in range(2):
+        with pytest.raises(requests.RequestException):
+            # Nothing listens on the discard port; the token is taken before connecting
+            client.request('GET', 'http://127.0.0.1:9/search', rate_limit_key='provider:unconfigured')
+
+    stats = limiter.stats()
+    assert 'provider:unconfigured' not in stats
+    assert stats[main.domain_key('http://127.0.0.1:9/')]['calls'] == 2
+
+
+def test_disabled_integrations_get_no_bucket(workdir):
+    system = main.JobApplicationSystem({'integrations': {
+        'enabled_api': {'enabled': True, 'rate_limit': 60},
+        'disabled_api': {'enabled': False, 'rate_limit': 60},
+    }})
+
+    assert system.rate_limiter.limit_for('provider:enabled_api') == (1.0, 1.0)
+    assert system.rate_limiter.limit_for('provider:disabled_api') is None
@@ -0,0 +1,73 @@
+"""On-disk agent response cache: keys, LRU eviction and TTL"""
+
+import json
+import time
+
+import main
+
+
+def test_key_covers_everything_that_changes_the_response():
+    key = main.ResponseCache.make_key('gpt-4', 0.2, 500, "Analyse this posting")
+
+    assert key == main.ResponseCache.make_key('gpt-4', 0.2, 500, "Analyse this posting")
+    assert len({key,
+                main.ResponseCache.make_key('gpt-3.5-turbo', 0.2, 500, "Analyse this posting"),
+                main.ResponseCache.make_key('gpt-4', 0.7, 500, "Analyse this posting"),
+                main.ResponseCache.make_key('gpt-4', 0.2, 100, "Analyse this posting"),
+                main.ResponseCache.make_key('gpt-4', 0.2, 500, "Analyse that posting")}) == 5
+
+
+def test_responses_survive_a_restart(tmp_path):
+    main.ResponseCache(tmp_path).put('a' * 64, "cached answer")
+
+    cache = main.ResponseCache(tmp_path)
+
+    assert cache.get('a' * 64) == "cached answer"
+    assert cache.get('b' * 64) is None
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_budget(tmp_path):
+    keys = [str(index) * 64 for index in range(3)]
+    response = "x" * 400
+    cache = main.ResponseCache(tmp_path, max_size_mb=1200 / 1024 / 1024)
+    cache.put(keys[0], response)
+    cache.put(keys[1], response)
+    # Reading the oldest entry makes the other one the least recently used
+    assert cache.get(keys[0]) == response
+
+    cache.put(keys[2], response)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == cache.get(keys[2]) == response
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size_bytes'] <= 1200
+
+
+def test_expired_entries_are_misses_and_removed(tmp_path):
+    cache = main.ResponseCache(tmp_path, ttl_hours=1)
+    key = 'c' * 64
+    cache.put(key, "stale answer")
+    entry_path = cache._entry_path(key)
+    entry = json.loads(entry_path.read_text(encoding='utf-8'))
+    entry['created_at'] = time.time() - 7200
+    entry_path.write_text(json.dumps(entry), encoding='utf-8')
+
+    assert cache.get(key) is None
+    assert not entry_path.exists()
+    assert cache.stats()['entries'] == 0
+
+
+def test_repeated_run_is_answered_from_the_cache(workdir):
+    inputs = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+              'personal_writeup': 'Engineer'}
+    system = main.JobApplicationSystem({
+        'mock_latency': {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}},
+        'cache': {'stage_checkpoints': {'enabled': False}, 'company_research': {'enabled': False}}
+    })
+
+    first = system.run_analysis(inputs)['response_cache']
+    second = system.run_analysis(inputs)['response_cache']
+
+    assert first['hits'] == 0
+    assert second['hits'] - first['hits'] == first['misses']
@@ -0,0 +1,71 @@
+"""SQLite results store: recording, querying and migrating per-run metadata"""
+
+import json
+from datetime import datetime
+
+import main
+
+
+def record(store, run_id, url, status='success'):
+    store.record_run(run_id, {'job_posting_url': url, 'github_url': 'https://github.com/example'}, {
+        'status': status, 'output_directory': f"runs/{run_id}", 'total_time': 1.5,
+        'critical_path': ['job_analysis', 'cover_letter'],
+        'stage_timings': {'job_analysis': {'status': 'completed', 'start': 0, 'end': 1, 'duration': 1}},
+    }, {'analysis.md': {'blob': 'ab' * 32, 'size': 10}})
+
+
+def test_runs_are_found_by_company_in_any_form(tmp_path):
+    store = main.ResultsStore(tmp_path / 'results.db')
+    record(store, 'run1', 'https://jobs.lever.co/Acme/123')
+    record(store, 'run2', 'https://boards.greenhouse.io/acme/jobs/9', status='partial_success')
+    record(store, 'run3', 'https://careers.other.com/job')
+
+    for company in ('acme', ' ACME ', 'https://jobs.lever.co/acme/456'):
+        assert sorted(run['run_id'] for run in store.query(company=company)) == ['run1', 'run2']
+    assert [run['run_id'] for run in store.query(status='partial_success')] == ['run2']
+    assert [run['run_id'] for run in store.query(company='other.com')] == ['run3']
+    assert len(store.query(limit=2)) == 2
+    assert store.query(since=datetime(2100, 1, 1).isoformat()) == []
+
+
+def test_recording_a_run_again_replaces_it(tmp_path):
+    store = main.ResultsStore(tmp_path / 'results.db')
+    record(store, 'run1', 'https://jobs.lever.co/acme/1', status='partial_success')
+    record(store, 'run1', 'https://jobs.lever.co/acme/1')
+
+    [run] = store.query()
+    assert run['status'] == 'success'
+    assert run['critical_path'] == 'job_analysis -> cover_letter'
+    assert store.stage_timings('run1') == {
+        'job_analysis': {'status': 'completed', 'start': 0, 'end': 1, 'duration': 1}
+    }
+
+
+def test_metadata_files_are_imported_once(tmp_path):
+    store = main.ResultsStore(tmp_path / 'results.db')
+    legacy = tmp_path / 'metadata_20250628_221444.json'
+    legacy.write_text(json.dumps({
+        'timestamp': '2025-06-28T22:14:44', 'inputs': {'job_posting_url': 'https://jobs.lever.co/acme/1'},
+        'files_generated': [f"{prefix}_20250628_221444.md" for prefix in main.JobApplicationSystem.STAGE_OUTPUT_FILES]
+    }))
+    run_dir = tmp_path / 'runs' / 'run2'
+    run_dir.mkdir(parents=True)
+    (run_dir / 'metadata.json').write_text(json.dumps({'timestamp': '2025-06-29T10:00:00', 'status': 'error',
+                                                      'inputs': {}}))
+    unreadable = tmp_path / 'metadata_broken.json'
+    unreadable.write_text("{")
+
+    assert store.migrate_metadata_files([legacy, run_dir / 'metadata.json', unreadable]) == 2
+    assert store.migrate_metadata_files([legacy]) == 0
+
+    runs = {run['run_id']: run for run in store.query()}
+    assert runs['20250628_221444']['status'] == 'success'
+    assert runs['20250628_221444']['company'] == 'acme'
+    assert runs['run2']['status'] == 'error'
+    assert runs['run2']['output_directory'] == str(run_dir)
+
+
+def test_since_accepts_relative_ages_and_iso_dates():
+    assert main.parse_since('2025-06-28') == '2025-06-28T00:00:00'
+    assert main.parse_since('7d') < datetime.now().isoformat()
+    assert main.parse_since('12h') > main.parse_since('1d')
@@ -0,0 +1,73 @@
+"""Run-scoped output directories, the manifest index and staging cleanup"""
+
+import os
+import threading
+import time
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def test_manifest_is_read_newest_first(tmp_path):
+    manifest = main.RunManifest(tmp_path / 'manifest.jsonl')
+    for index in range(5):
+        manifest.append({'run_id': f"run{index}", 'version': 1})
+    manifest.append({'run_id': 'run1', 'version': 2})
+
+    assert [entry['run_id'] for entry in manifest.iter_entries()] == ['run1', 'run4', 'run3', 'run2', 'run1', 'run0']
+    assert [entry['run_id'] for entry in manifest.iter_entries(newest_first=False)][0] == 'run0'
+    # The latest entry of a run wins
+    assert manifest.find('run1')['version'] == 2
+    assert manifest.find('missing') is None
+    assert list(main.RunManifest(tmp_path / 'none.jsonl').iter_entries()) == []
+
+
+def test_concurrent_appends_never_interleave(tmp_path):
+    manifest = main.RunManifest(tmp_path / 'manifest.jsonl')
+    payload = "x" * 5000
+
+    def append_many(worker):
+        for index in range(50):
+            manifest.append({'run_id': f"{worker}-{index}", 'payload': payload})
+
+    threads = [threading.Thread(target=append_many, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entries = list(manifest.iter_entries())
+    assert len(entries) == 200
+    assert all(entry['payload'] == payload for entry in entries)
+
+
+def test_each_run_gets_its_own_directory_and_manifest_entry(workdir):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY})
+
+    first = system.run_analysis(INPUTS, run_label='first')
+    second = system.run_analysis(INPUTS, run_label='second')
+
+    assert first['run_id'] != second['run_id']
+    assert '_first_' in first['run_id']
+    for result in (first, second):
+        entry = system.manifest.find(result['run_id'])
+        run_dir = system.output_dir / entry['directory']
+        assert run_dir == main.Path(result['output_directory'])
+        assert sorted(entry['files']) == sorted(path.name for path in run_dir.iterdir())
+    # Nothing is left in staging once a run is published
+    assert not any((system.output_dir / main.RunWriter.STAGING_DIR).glob('*'))
+
+
+def test_stale_staging_directories_are_removed(tmp_path):
+    staging_root = tmp_path / main.RunWriter.STAGING_DIR
+    for name, age_hours in (('crashed', 48), ('in_progress', 0)):
+        (staging_root / name).mkdir(parents=True)
+        (staging_root / name / 'analysis.md').write_text("partial")
+        modified = time.time() - age_hours * 3600
+        os.utime(staging_root / name, (modified, modified))
+
+    assert main.RunWriter.clean_stale(tmp_path, max_age_hours=24) == 1
+    assert [path.name for path in staging_root.iterdir()] == ['in_progress']
@@ -0,0 +1,69 @@
+"""TaskGraphScheduler: dependency-ordered, concurrent stage execution"""
+
+import asyncio
+import time
+
+import pytest
+
+import main
+
+
+def make_task(name, context=None):
+    agent = main.MockAgent(role=name, mock_response=f"{name} output")
+    return main.MockTask(name, f"Run {name}", agent, context=context)
+
+
+def test_independent_tasks_run_concurrently_after_their_context():
+    first = make_task('first')
+    second = make_task('second')
+    last = make_task('last', context=[first, second])
+
+    def execute(task, context_outputs):
+        time.sleep(0.2)
+        return sorted(context_outputs)
+
+    result = asyncio.run(main.TaskGraphScheduler([first, second, last]).run(execute))
+
+    assert result['outputs']['last'] == ['first', 'second']
+    timings = result['stage_timings']
+    assert timings['last']['start'] >= max(timings['first']['end'], timings['second']['end'])
+    # first and second overlap, so the whole graph takes two steps rather than three
+    assert result['total_time'] < 0.55
+    assert result['critical_path'][-1] == 'last'
+
+
+def test_topological_order_puts_context_first():
+    first = make_task('first')
+    last = make_task('last', context=[first])
+
+    assert main.TaskGraphScheduler([last, first]).order == ['first', 'last']
+
+
+def test_dependency_cycles_are_rejected():
+    first = make_task('first')
+    second = make_task('second', context=[first])
+    first.context = [second]
+
+    with pytest.raises(ValueError, match="cycle"):
+        main.TaskGraphScheduler([first, second])
+
+
+def test_unknown_context_task_is_rejected():
+    orphan = make_task('orphan')
+    task = make_task('task', context=[orphan])
+
+    with pytest.raises(ValueError, match="unknown task 'orphan'"):
+        main.TaskGraphScheduler([task])
+
+
+def test_completion_callback_sees_each_stage():
+    first = make_task('first')
+    last = make_task('last', context=[first])
+    completed = []
+
+    asyncio.run(main.TaskGraphScheduler([first, last]).run(
+        lambda task, context_outputs: task.name,
+        on_complete=lambda name, output, timing: completed.append((name, output, timing['status']))
+    ))
+
+    assert completed == [('first', 'first', 'completed'), ('last', 'last', 'completed')]
@@ -0,0 +1,105 @@
+"""Conditional-GET scrape cache: fresh hits, ETag / Last-Modified revalidation and refetches"""
+
+import http.server
+import threading
+
+import pytest
+
+import main
+
+LAST_MODIFIED = 'Sat, 28 Jun 2025 18:22:59 GMT'
+
+
+@pytest.fixture
+def site():
+    """A page whose body and validators the test can change; records the headers of every request"""
+    class Site:
+        body = b"<html>Senior AI Engineer</html>"
+        validators = {'ETag': '"v1"'}
+        requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            Site.requests.append(dict(self.headers))
+            etag = next((value for name, value in Site.validators.items() if name.lower() == 'etag'), None)
+            if (etag and self.headers.get('If-None-Match') == etag) or (
+                    not etag and self.headers.get('If-Modified-Since') == Site.validators.get('Last-Modified')):
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            for name, value in Site.validators.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(Site.body)))
+            self.end_headers()
+            self.wfile.write(Site.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    Site.url = f"http://127.0.0.1:{server.server_port}/posting"
+    yield Site
+    server.shutdown()
+
+
+def make_client(tmp_path, ttl_hours):
+    return main.HttpClient(timeout_seconds=2, cache=main.ScrapeCache(tmp_path / 'scrape', ttl_hours=ttl_hours))
+
+
+def test_fresh_entries_need_no_request(tmp_path, site):
+    client = make_client(tmp_path, ttl_hours=1)
+
+    assert client.get(site.url).body == site.body
+    assert client.get(site.url).body == site.body
+    assert client.fresh_from_cache(site.url).body == site.body
+
+    assert len(site.requests) == 1
+    assert client.cache.stats()['miss'] == 1 and client.cache.stats()['fresh'] == 2
+
+
+def test_stale_entries_are_revalidated_with_their_etag(tmp_path, site):
+    client = make_client(tmp_path, ttl_hours=0)
+    client.get(site.url)
+
+    response = client.get(site.url)
+
+    assert response.status == 200 and response.body == site.body
+    assert site.requests[-1]['If-None-Match'] == '"v1"'
+    stats = client.cache.stats()
+    assert stats['revalidated'] == 1
+    assert stats['bytes_saved'] == len(site.body)
+
+
+def test_lowercase_validator_headers_are_honoured(tmp_path, site):
+    site.validators = {'etag': '"lower"'}
+    client = make_client(tmp_path, ttl_hours=0)
+    client.get(site.url)
+
+    client.get(site.url)
+
+    assert site.requests[-1]['If-None-Match'] == '"lower"'
+    assert client.cache.stats()['revalidated'] == 1
+
+
+def test_last_modified_is_used_without_an_etag(tmp_path, site):
+    site.validators = {'Last-Modified': LAST_MODIFIED}
+    client = make_client(tmp_path, ttl_hours=0)
+    client.get(site.url)
+
+    client.get(site.url)
+
+    assert site.requests[-1]['If-Modified-Since'] == LAST_MODIFIED
+    assert 'If-None-Match' not in site.requests[-1]
+    assert client.cache.stats()['revalidated'] == 1
+
+
+def test_changed_pages_are_fetched_and_cached_again(tmp_path, site):
+    client = make_client(tmp_path, ttl_hours=0)
+    client.get(site.url)
+    site.body, site.validators = b"<html>Position filled</html>", {'ETag': '"v2"'}
+
+    assert client.get(site.url).body == b"<html>Position filled</html>"
+    assert client.cache.load(site.url)['body'] == b"<html>Position filled</html>"
+    assert client.cache.stats()['miss'] == 2
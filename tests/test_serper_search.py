@@ -0,0 +1,80 @@
+"""Serper search tool: configuration and failure handling"""
+
+import http.server
+import json
+import threading
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def serve():
+    """Serve one fixed (status, body) for every POST on a local port and yield its URL"""
+    servers = []
+
+    def start(status, body):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/search"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def make_tool(endpoint):
+    return main.SerperSearchTool(main.HttpClient(timeout_seconds=1), 'key', max_results=2, endpoint=endpoint)
+
+
+def test_results_are_formatted_from_organic_hits(serve):
+    body = json.dumps({'organic': [{'title': f"T{i}", 'link': f"L{i}", 'snippet': f"S{i}"} for i in range(3)]})
+    tool = make_tool(serve(200, body.encode()))
+
+    assert tool.search('ai jobs') == "T0\nL0\nS0\n\nT1\nL1\nS1"
+
+
+def test_request_failure_becomes_an_observation():
+    # Nothing listens on the discard port
+    tool = make_tool('http://127.0.0.1:9/search')
+
+    assert tool.search('ai jobs').startswith("Search failed for ai jobs:")
+
+
+def test_undecodable_response_becomes_an_observation(serve):
+    tool = make_tool(serve(200, b"<html>maintenance</html>"))
+
+    assert tool.search('ai jobs').startswith("Search failed for ai jobs:")
+
+
+def test_error_status_becomes_an_observation(serve):
+    tool = make_tool(serve(403, b"{}"))
+
+    assert tool.search('ai jobs') == "Search failed for ai jobs: HTTP 403"
+
+
+def test_search_tool_reads_endpoint_and_key_from_integration_config(workdir, monkeypatch):
+    monkeypatch.setenv('CUSTOM_SERPER_KEY', 'real-key')
+    config = {'tools': {'http': {'enabled': True}},
+              'integrations': {'serper_api': {'endpoint': 'http://search.internal/q', 'api_key_env': 'CUSTOM_SERPER_KEY'}}}
+
+    tool = main.JobApplicationSystem(config).create_search_tool()
+
+    assert isinstance(tool, main.SerperSearchTool)
+    assert (tool.endpoint, tool.api_key) == ('http://search.internal/q', 'real-key')
+
+    config['integrations']['serper_api']['enabled'] = False
+    assert isinstance(main.JobApplicationSystem(config).create_search_tool(), main.MockSearchTool)
@@ -0,0 +1,76 @@
+"""HTTP analysis service: status codes and admission control"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+@pytest.fixture
+def service(workdir):
+    service = main.AnalysisService(main.JobApplicationSystem({'mock_latency': ZERO_LATENCY}), workers=1)
+    server = main.create_http_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service.url = f"http://127.0.0.1:{server.server_address[1]}"
+    service.ready = True
+    yield service
+    server.shutdown()
+    server.server_close()
+
+
+def request(url, body=None):
+    """(status, JSON payload) of a GET, or of a POST when body is given"""
+    data = body if isinstance(body, bytes) or body is None else json.dumps(body).encode('utf-8')
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_analysis_succeeds_and_is_counted(service):
+    status, result = request(f"{service.url}/analyze", INPUTS)
+
+    assert status == 200
+    assert result['status'] == 'success'
+    assert request(f"{service.url}/status")[1]['completed'] == 1
+    assert request(f"{service.url}/readyz")[0] == 200
+
+
+def test_invalid_requests_are_client_errors(service):
+    assert request(f"{service.url}/analyze", b"{not json")[0] == 400
+    assert request(f"{service.url}/analyze", [INPUTS])[0] == 400
+
+    status, result = request(f"{service.url}/analyze", {'github_url': 'https://github.com/example'})
+    assert status == 400
+    assert result['error_type'] == 'invalid_input'
+
+
+def test_failures_inside_the_run_are_server_errors(service, monkeypatch):
+    def broken_setup(system):
+        raise RuntimeError("task setup failed")
+
+    monkeypatch.setattr(main.JobApplicationSystem, 'setup_tasks', broken_setup)
+
+    status, result = request(f"{service.url}/analyze", INPUTS)
+
+    assert status == 500
+    assert result['error_type'] == 'internal'
+
+
+def test_exceptions_escaping_the_service_are_server_errors(service, monkeypatch):
+    def crash(inputs):
+        raise RuntimeError("worker crashed")
+
+    monkeypatch.setattr(service, 'analyze', crash)
+
+    assert request(f"{service.url}/analyze", INPUTS) == (500, {'status': 'error', 'error': "worker crashed",
+                                                            'error_type': 'internal'})
@@ -0,0 +1,84 @@
+"""In-flight coalescing of identical tool and LLM calls"""
+
+import threading
+import time
+
+import main
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def test_concurrent_calls_with_one_key_run_once():
+    flights = main.SingleFlight()
+    release = threading.Event()
+    executions = []
+    results = []
+
+    def compute():
+        executions.append(1)
+        release.wait(2)
+        return 'value'
+
+    threads = run_concurrently(5, lambda: results.append(flights.do('key', compute)))
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert {value for value, _ in results} == {'value'}
+
+
+def test_leader_errors_reach_every_waiter_and_the_key_is_released():
+    flights = main.SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        release.wait(2)
+        raise RuntimeError("boom")
+
+    def call():
+        try:
+            flights.do('key', fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = run_concurrently(3, call)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["boom"] * 3
+    assert flights.do('key', lambda: 'again') == ('again', False)
+
+
+def test_single_flight_tool_coalesces_identical_arguments_only():
+    class SlowTool:
+        def __init__(self):
+            self.calls = []
+
+        def scrape(self, url):
+            self.calls.append(url)
+            time.sleep(0.2)
+            return f"page {url}"
+
+    tool = SlowTool()
+    wrapped = main.SingleFlightTool(tool, main.SingleFlight(), 'scrape_tool')
+    results = []
+
+    threads = run_concurrently(4, lambda: results.append(wrapped.scrape('https://example.com/a')))
+    threads += run_concurrently(1, lambda: results.append(wrapped.scrape('https://example.com/b')))
+    for thread in threads:
+        thread.join()
+
+    assert sorted(tool.calls) == ['https://example.com/a', 'https://example.com/b']
+    assert results.count("page https://example.com/a") == 4
+    assert not hasattr(wrapped, 'search')
@@ -0,0 +1,54 @@
+"""Lazy construction of JobApplicationSystem components and deferred heavy imports"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import types
+from pathlib import Path
+
+import main
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_constructing_the_system_imports_no_heavy_modules(tmp_path):
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(REPO_ROOT)!r})
+        import main
+
+        system = main.JobApplicationSystem({{}})
+        heavy = ('crewai', 'crewai_tools', 'requests', 'chardet', 'sqlite3')
+        loaded = sorted(name for name in sys.modules if name.split('.')[0] in heavy)
+        assert not loaded, loaded
+        assert 'search_tool' not in vars(system) and 'job_researcher' not in vars(system)
+    """)
+    env = {**os.environ, 'JOB_APPLICATION_LOG_FILE': str(tmp_path / 'startup.log')}
+
+    completed = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env,
+                               capture_output=True, text=True, timeout=60)
+
+    assert completed.returncode == 0, completed.stderr
+
+
+def test_components_are_created_on_first_use(workdir):
+    system = main.JobApplicationSystem({})
+
+    assert 'search_tool' not in vars(system)
+    assert isinstance(system.search_tool.tool, main.MockSearchTool)
+    assert 'scrape_tool' in vars(system) and 'read_resume' in vars(system)
+
+
+def test_resume_reader_only_needs_file_read_tool_from_crewai_tools(workdir, monkeypatch):
+    class FileReadTool:
+        def __init__(self, file_path):
+            self.file_path = file_path
+
+    # An install that only provides the tool initialize_tools actually uses
+    monkeypatch.setitem(sys.modules, 'crewai_tools', types.SimpleNamespace(FileReadTool=FileReadTool))
+
+    system = main.JobApplicationSystem({})
+
+    assert isinstance(system.read_resume.tool, FileReadTool)
+    assert isinstance(system.search_tool.tool, main.MockSearchTool)
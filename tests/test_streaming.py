@@ -0,0 +1,45 @@
+"""Streaming analysis: stage events as the stages finish, then the complete event"""
+
+import asyncio
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def test_stage_events_arrive_before_the_complete_event(workdir):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY})
+
+    events = list(system.iter_analysis(INPUTS))
+
+    assert [event['event'] for event in events] == ['stage'] * (len(events) - 1) + ['complete']
+    stages = [event['stage'] for event in events[:-1]]
+    result = events[-1]['result']
+    assert sorted(stages) == sorted(result['stage_timings'])
+    # A stage is reported only after the stages in its context
+    for task in system.tasks:
+        assert all(stages.index(dependency.name) < stages.index(task.name) for dependency in task.context)
+    assert all(event['status'] == 'completed' for event in events[:-1])
+
+
+def test_async_stream_matches_the_sync_run(workdir):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY})
+
+    async def collect():
+        return [event async for event in system.astream_analysis(INPUTS, resume=False)]
+
+    events = asyncio.run(collect())
+
+    assert events[-1]['event'] == 'complete'
+    assert events[-1]['result']['status'] == 'success'
+    assert sum(len(event['files']) for event in events[:-1]) > 0
+
+
+def test_invalid_inputs_complete_immediately_with_an_error(workdir):
+    events = list(main.JobApplicationSystem({'mock_latency': ZERO_LATENCY}).iter_analysis({'github_url': 'x'}))
+
+    assert [event['event'] for event in events] == ['complete']
+    assert events[0]['result']['status'] == 'error'
+
@@ -0,0 +1,69 @@
+"""Span tracing: nesting, buffering and export to JSONL"""
+
+import json
+import time
+
+import main
+
+INPUTS = {'job_posting_url': 'https://jobs.example.com/ai-engineer', 'github_url': 'https://github.com/example',
+          'personal_writeup': 'Engineer'}
+ZERO_LATENCY = {'stages': {'default': {'model': 'zero'}}, 'tools': {'default': {'model': 'zero'}}}
+
+
+def read_spans(trace_path):
+    if not trace_path.exists():
+        return []
+    return [json.loads(line) for line in trace_path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_spans_nest_and_are_written_when_the_root_ends(tmp_path):
+    exporter = main.TraceExporter(tmp_path / 'traces.jsonl')
+    root = main.Span('run', 'run', exporter)
+    with main.trace_span('stage', 'stage', parent=root):
+        with main.trace_span('search', 'tool', query='ai'):
+            pass
+
+    # Buffered until the trace's root span ends
+    assert read_spans(exporter.trace_path) == []
+    root.finish()
+
+    spans = {span['name']: span for span in read_spans(exporter.trace_path)}
+    assert spans['search']['parent_id'] == spans['stage']['span_id']
+    assert spans['stage']['parent_id'] == spans['run']['span_id']
+    assert {span['trace_id'] for span in spans.values()} == {spans['run']['trace_id']}
+    assert spans['search']['attributes'] == {'query': 'ai'}
+
+
+def test_failed_spans_record_the_error(tmp_path):
+    exporter = main.TraceExporter(tmp_path / 'traces.jsonl')
+    try:
+        with main.trace_span('call', 'llm', exporter=exporter):
+            raise RuntimeError("model unavailable")
+    except RuntimeError:
+        pass
+
+    [span] = read_spans(exporter.trace_path)
+    assert span['status'] == 'error'
+    assert span['attributes']['error'] == "model unavailable"
+
+
+def test_spans_of_an_abandoned_stage_are_written_when_it_ends(workdir, monkeypatch):
+    system = main.JobApplicationSystem({'mock_latency': ZERO_LATENCY, 'cache': {'stage_checkpoints': {'enabled': False}},
+                                        'tasks': {'job_discovery': {'timeout_minutes': 0.2 / 60}}})
+    execute_task = system.execute_task
+
+    def hang_on_job_analysis(task, inputs, context_outputs):
+        if task.name == 'job_analysis':
+            # Past the deadline and never checking it, so the scheduler abandons the stage
+            time.sleep(0.8)
+        return execute_task(task, inputs, context_outputs)
+
+    monkeypatch.setattr(system, 'execute_task', hang_on_job_analysis)
+
+    result = system.run_analysis(INPUTS)
+    assert result['status'] == 'partial_success'
+    assert 'job_analysis' in result['timed_out_stages']
+
+    time.sleep(1.2)
+    stages = {span['name'] for span in read_spans(system.tracer.trace_path) if span['kind'] == 'stage'}
+    assert 'job_analysis' in stages